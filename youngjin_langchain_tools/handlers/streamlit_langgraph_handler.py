@@ -12,14 +12,32 @@ Supports LangSmith integration for feedback collection via run_id tracking.
 
 from typing import Any, Dict, List, Optional, Generator
 from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
 import logging
 import re
+import time
 
 from langchain_core.callbacks.base import BaseCallbackHandler
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# streamlit module, imported on first use by _import_streamlit()
+_st: Any = None
+
+# Streamed tokens are rendered in batches: the response placeholder is
+# re-rendered after this many seconds or this many pending tokens,
+# whichever comes first
+_RESPONSE_FLUSH_INTERVAL = 0.03
+_RESPONSE_FLUSH_TOKENS = 8
+
+# Appended to tool output cut at max_tool_content_length
+_TRUNCATION_SUFFIX = "\n... (truncated)"
+
+# Maximum characters of tool call args shown inline
+_MAX_TOOL_ARGS_LENGTH = 512
+
 
 # ============================================================
 # Run ID Callback Handler for LangSmith Integration
@@ -62,6 +80,8 @@ class _RunIdCaptureCallback(BaseCallbackHandler):
 # ============================================================
 # Error Patterns for User-Friendly Messages
 # ============================================================
+# Internal: kept as a public name for backward compatibility only.
+# Matching goes through the precompiled _COMPILED_ERROR_PATTERNS below.
 ERROR_PATTERNS = {
     # OpenAI errors
     r"AuthenticationError.*API key|openai.*api.*key|OPENAI_API_KEY": {
@@ -136,35 +156,157 @@ ERROR_PATTERNS = {
     },
 }
 
+# Compiled once at import so _parse_error doesn't re-parse patterns per error
+_COMPILED_ERROR_PATTERNS = [
+    (re.compile(pattern, re.IGNORECASE), info)
+    for pattern, info in ERROR_PATTERNS.items()
+]
+
+# All patterns fused into one alternation (group g<i> = pattern i). This only
+# saves work when nothing matches (one scan instead of one per pattern); on a
+# match, _match_error_pattern re-checks the earlier patterns one by one, which
+# costs about as much as the plain sequential walk
+_FUSED_ERROR_PATTERN = re.compile(
+    "|".join(f"(?P<g{i}>{pattern})" for i, pattern in enumerate(ERROR_PATTERNS)),
+    re.IGNORECASE,
+)
+
+# Lowercase literals such that every pattern above requires at least one of
+# them; an error containing none can't match and skips the regex entirely.
+# Keep in sync when adding to ERROR_PATTERNS.
+_ERROR_KEYWORDS = (
+    "api key",
+    "openai",
+    "ratelimit",
+    "rate_limit",
+    "429",
+    "insufficientquota",
+    "insufficient_quota",
+    "billing",
+    "invalidrequest",
+    "invalid_request",
+    "anthropic",
+    "google",
+    "connection",
+    "network",
+    "timeout",
+    "timed out",
+    "model",
+    "does not exist",
+)
+
+# Read-only result fields for each pattern, built once and shared across
+# calls; _parse_error only adds the per-error original_error
+_MATCHED_ERROR_RESULTS = [
+    MappingProxyType({
+        "matched": True,
+        "title": info["title"],
+        "message": info["message"],
+        "solution": tuple(info["solution"]),
+    })
+    for _, info in _COMPILED_ERROR_PATTERNS
+]
+
+# Exception type names that match a pattern on their own, mapped to that
+# pattern's index so those errors skip the prescreen and fused scan
+_ERROR_TYPE_INDEX = {
+    error_type: next(
+        i for i, (pattern, _) in enumerate(_COMPILED_ERROR_PATTERNS)
+        if pattern.search(error_type)
+    )
+    for error_type in (
+        "RateLimitError",
+        "InsufficientQuotaError",
+        "InvalidRequestError",
+        "ConnectionError",
+        "TimeoutError",
+    )
+}
+
+
+@lru_cache(maxsize=256)
+def _match_error_pattern(error_type: str, error_str: str) -> Optional[int]:
+    """Return the index of the first matching error pattern, or None.
+
+    Cached because agents tend to raise the same error repeatedly
+    (e.g. an auth failure on every retry).
+    """
+    full_error = f"{error_type}: {error_str}"
+
+    index = _ERROR_TYPE_INDEX.get(error_type)
+    if index is None:
+        # Cheap keyword prescreen before any regex work
+        lowered = full_error.lower()
+        if not any(keyword in lowered for keyword in _ERROR_KEYWORDS):
+            return None
+
+        match = _FUSED_ERROR_PATTERN.search(full_error)
+        if match is None:
+            return None
+        group = match.lastgroup
+        assert group is not None  # Every alternative is a named group
+        index = int(group[1:])
+
+    # The type lookup and the fused (leftmost) match can both land past an
+    # earlier pattern that matches elsewhere in the string; that one wins
+    for i in range(index):
+        if _COMPILED_ERROR_PATTERNS[i][0].search(full_error):
+            return i
+    return index
+
 
 def _parse_error(error: Exception) -> Dict[str, Any]:
     """Parse an exception and return user-friendly error information."""
     error_str = str(error)
     error_type = type(error).__name__
-    full_error = f"{error_type}: {error_str}"
+    # Truncate for display
+    original_error = error_str if len(error_str) <= 500 else error_str[:500]
 
     # Try to match known error patterns
-    for pattern, info in ERROR_PATTERNS.items():
-        if re.search(pattern, full_error, re.IGNORECASE):
-            return {
-                "matched": True,
-                "title": info["title"],
-                "message": info["message"],
-                "solution": info["solution"],
-                "original_error": error_str[:500],  # Truncate for display
-            }
+    index = _match_error_pattern(error_type, error_str)
+    if index is not None:
+        return {
+            **_MATCHED_ERROR_RESULTS[index],
+            "original_error": original_error,
+        }
 
     # Unknown error - return generic info
     return {
         "matched": False,
         "title": "❗ 오류 발생",
         "message": f"{error_type}",
-        "solution": ["에러 메시지를 확인하고 문제를 해결해주세요."],
-        "original_error": error_str[:500],
+        "solution": ("에러 메시지를 확인하고 문제를 해결해주세요.",),
+        "original_error": original_error,
     }
 
 
-@dataclass
+def _import_streamlit() -> Any:
+    """Import streamlit once and cache it in the module-level _st.
+
+    Imported lazily to avoid import errors when not using streamlit.
+    """
+    global _st
+    if _st is None:
+        try:
+            import streamlit
+        except ImportError:
+            raise ImportError(
+                "streamlit is required for StreamlitLanggraphHandler. "
+                "Install it with: pip install streamlit"
+            )
+        _st = streamlit
+    return _st
+
+
+def _format_tool_args(args: Any, max_length: int) -> str:
+    """Format tool call args for inline display, truncated to max_length."""
+    text = str(args)
+    if len(text) <= max_length:
+        return text
+    return f"{text[:max_length]}..."
+
+
+@dataclass(slots=True)
 class StreamlitLanggraphHandlerConfig:
     """Configuration for StreamlitLanggraphHandler.
 
@@ -264,6 +406,22 @@ class StreamlitLanggraphHandler:
         ```
     """
 
+    __slots__ = (
+        "_config",
+        "_container",
+        "_final_response",
+        "_status_container",
+        "_thoughts_placeholder",
+        "_response_placeholder",
+        "_last_flush_ts",
+        "_pending_tokens",
+        "_thought_history",
+        "_current_thoughts",
+        "_thought_counter",
+        "_run_id",
+        "_run_id_callback",
+    )
+
     def __init__(
         self,
         container: Any,
@@ -330,6 +488,8 @@ class StreamlitLanggraphHandler:
         self._status_container: Any = None
         self._thoughts_placeholder: Any = None  # Placeholder inside status for re-render
         self._response_placeholder: Any = None
+        self._last_flush_ts: float = 0.0  # Last response placeholder render
+        self._pending_tokens: int = 0  # Tokens received since last render
         self._thought_history: List[Dict[str, Any]] = []  # History of old thoughts
         self._current_thoughts: List[Dict[str, Any]] = []  # Current visible thoughts
         self._thought_counter: int = 0  # Unique ID counter for thoughts
@@ -452,17 +612,12 @@ class StreamlitLanggraphHandler:
                 langsmith_client.create_feedback(handler.run_id, "thumbs", score=1)
             ```
         """
-        # Import streamlit here to avoid import errors when not using streamlit
-        try:
-            import streamlit as st
-        except ImportError:
-            raise ImportError(
-                "streamlit is required for StreamlitLanggraphHandler. "
-                "Install it with: pip install streamlit"
-            )
+        st = _import_streamlit()
 
         # Reset state
         self._final_response = ""
+        self._last_flush_ts = 0.0
+        self._pending_tokens = 0
         self._thought_history = []
         self._current_thoughts = []
         self._thought_counter = 0
@@ -549,7 +704,8 @@ class StreamlitLanggraphHandler:
         agent_config: Dict[str, Any],
     ) -> Generator[Dict[str, Any], None, None]:
         """Internal stream implementation without LangSmith wrapper."""
-        import streamlit as st
+        st = _st  # Imported by stream()
+        cursor = self._config.cursor
 
         try:
             for stream_mode, data in agent.stream(
@@ -557,10 +713,60 @@ class StreamlitLanggraphHandler:
                 config=agent_config,
                 stream_mode=["messages", "updates"]
             ):
-                if stream_mode == "updates":
+                if stream_mode == "messages":
+                    # Handled inline rather than in a sub-generator since
+                    # this runs once per streamed token
+                    chunk, metadata = data
+
+                    # Skip tool node messages
+                    if metadata.get("langgraph_node") == "tools":
+                        continue
+
+                    # Skip empty chunks and tool call chunks
+                    if not (hasattr(chunk, 'content') and chunk.content):
+                        continue
+                    if hasattr(chunk, 'tool_call_chunks') and chunk.tool_call_chunks:
+                        continue
+
+                    # Extract text content (handles both OpenAI string and
+                    # Anthropic list formats)
+                    text_content = self._extract_text_content(chunk.content)
+                    if not text_content:
+                        continue
+
+                    self._final_response += text_content
+                    self._pending_tokens += 1
+
+                    # Re-render in batches rather than once per token
+                    now = time.monotonic()
+                    if (
+                        self._pending_tokens >= _RESPONSE_FLUSH_TOKENS
+                        or now - self._last_flush_ts > _RESPONSE_FLUSH_INTERVAL
+                    ):
+                        self._response_placeholder.markdown(
+                            self._final_response + cursor
+                        )
+                        self._last_flush_ts = now
+                        self._pending_tokens = 0
+
+                    yield {
+                        "type": "token",
+                        "data": {
+                            "content": text_content,
+                            "accumulated": self._final_response,
+                        },
+                    }
+                elif stream_mode == "updates":
+                    # Show pending text before tool activity, which may
+                    # take a while before the next token arrives
+                    if self._pending_tokens:
+                        self._response_placeholder.markdown(
+                            self._final_response + cursor
+                        )
+                        self._last_flush_ts = time.monotonic()
+                        self._pending_tokens = 0
+
                     yield from self._handle_updates(data)
-                elif stream_mode == "messages":
-                    yield from self._handle_messages(data)
 
             # Mark as complete - collapse based on config
             self._status_container.update(
@@ -592,8 +798,12 @@ class StreamlitLanggraphHandler:
                 with st.expander("🔍 상세 에러 메시지", expanded=False):
                     st.code(error_info["original_error"], language="text")
 
+            # Render the partial response in full, without the cursor
+            if self._final_response:
+                self._response_placeholder.markdown(self._final_response)
+
             # Log the full error for debugging
-            logger.error(f"Agent execution error: {e}", exc_info=True)
+            logger.error("Agent execution error: %s", e, exc_info=True)
 
             # Yield error event
             yield {
@@ -646,9 +856,17 @@ class StreamlitLanggraphHandler:
 
         if thought_type == "tool_call":
             # Tool call display: 🔧 tool_name: {args}
+            if in_history:
+                max_len = 200
+            else:
+                max_len = min(
+                    _MAX_TOOL_ARGS_LENGTH, self._config.max_tool_content_length
+                )
+            tool_args = _format_tool_args(thought_data['args'], max_len)
+
             st_module.markdown(
                 f"{self._config.tool_call_emoji} "
-                f"**{thought_data['name']}**: `{thought_data['args']}`"
+                f"**{thought_data['name']}**: `{tool_args}`"
             )
 
         elif thought_type == "tool_result":
@@ -670,17 +888,18 @@ class StreamlitLanggraphHandler:
                 should_expand = self._config.expand_new_thoughts
 
             with st_module.expander(f"📋 {tool_name} 결과 보기", expanded=should_expand):
-                if len(content) > max_len:
-                    st_module.code(content[:max_len] + "\n... (truncated)", language="text")
-                else:
-                    st_module.code(content, language="text")
+                display = (
+                    content if len(content) <= max_len
+                    else f"{content[:max_len]}{_TRUNCATION_SUFFIX}"
+                )
+                st_module.code(display, language="text")
 
     def _render_thoughts_in_status(self) -> None:
         """Render all thoughts (history + current) inside the status container.
 
         Uses placeholder.container() to completely replace previous content.
         """
-        import streamlit as st
+        st = _st  # Imported by stream()
 
         # Clear and re-render using placeholder
         with self._thoughts_placeholder.container():
@@ -701,12 +920,28 @@ class StreamlitLanggraphHandler:
         self,
         data: Dict[str, Any]
     ) -> Generator[Dict[str, Any], None, None]:
-        """Handle 'updates' stream mode events."""
+        """Handle 'updates' stream mode events.
+
+        tool_call/tool_result events and status label updates are emitted
+        even when show_tool_calls and show_tool_results are both False;
+        those flags only gate recording and re-rendering of thoughts.
+        """
+        # Read config once instead of on every message in the loop
+        show_calls = self._config.show_tool_calls
+        show_results = self._config.show_tool_results
+        call_emoji = self._config.tool_call_emoji
+        thinking_label = self._config.thinking_label
+        status_container = self._status_container
+
         for source, update in data.items():
-            if not isinstance(update, dict):
+            # Skip non-dict updates and updates without messages
+            try:
+                messages = update["messages"]
+            except (TypeError, KeyError):
                 continue
 
-            messages = update.get("messages", [])
+            # Only the tools node produces tool results; decide once per source
+            is_tools = source == "tools"
             for msg in messages:
                 # Handle tool calls
                 if hasattr(msg, 'tool_calls') and msg.tool_calls:
@@ -715,7 +950,7 @@ class StreamlitLanggraphHandler:
                         tool_args = tc.get('args', {})
 
                         # Only add to thoughts if show_tool_calls is True
-                        if self._config.show_tool_calls:
+                        if show_calls:
                             self._add_thought(
                                 "tool_call",
                                 {"name": tool_name, "args": tool_args}
@@ -723,8 +958,8 @@ class StreamlitLanggraphHandler:
                             self._render_thoughts_in_status()
 
                         # Update status label to show current action
-                        self._status_container.update(
-                            label=f"{self._config.tool_call_emoji} {tool_name}...",
+                        status_container.update(
+                            label=f"{call_emoji} {tool_name}...",
                             state="running"
                         )
 
@@ -734,12 +969,14 @@ class StreamlitLanggraphHandler:
                         }
 
                 # Handle tool results
-                if source == "tools" and hasattr(msg, 'name'):
+                if is_tools and hasattr(msg, 'name'):
                     tool_name = msg.name
-                    tool_content = str(msg.content) if hasattr(msg, 'content') else ""
+                    # Reuse string content as-is; only convert other types
+                    content = getattr(msg, 'content', "")
+                    tool_content = content if type(content) is str else str(content)
 
                     # Only add to thoughts if show_tool_results is True
-                    if self._config.show_tool_results:
+                    if show_results:
                         self._add_thought(
                             "tool_result",
                             {"name": tool_name, "content": tool_content}
@@ -747,8 +984,8 @@ class StreamlitLanggraphHandler:
                         self._render_thoughts_in_status()
 
                     # Update status to show thinking again
-                    self._status_container.update(
-                        label=self._config.thinking_label,
+                    status_container.update(
+                        label=thinking_label,
                         state="running"
                     )
 
@@ -802,34 +1039,3 @@ class StreamlitLanggraphHandler:
 
         # Fallback: try to convert to string
         return str(content)
-
-    def _handle_messages(
-        self,
-        data: tuple
-    ) -> Generator[Dict[str, Any], None, None]:
-        """Handle 'messages' stream mode events."""
-        chunk, metadata = data
-
-        # Skip tool node messages
-        if metadata.get("langgraph_node") == "tools":
-            return
-
-        # Handle content chunks
-        if hasattr(chunk, 'content') and chunk.content:
-            # Skip tool call chunks
-            if hasattr(chunk, 'tool_call_chunks') and chunk.tool_call_chunks:
-                return
-
-            # Extract text content (handles both OpenAI string and Anthropic list formats)
-            text_content = self._extract_text_content(chunk.content)
-
-            if text_content:
-                self._final_response += text_content
-                self._response_placeholder.markdown(
-                    self._final_response + self._config.cursor
-                )
-
-                yield {
-                    "type": "token",
-                    "data": {"content": text_content, "accumulated": self._final_response}
-                }